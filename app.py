@@ -3,11 +3,65 @@ from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 
 import pandas as pd
+import openpyxl
 import io
 
 app = Flask(__name__)
 CORS(app, resources={r"/upload": {"origins": "https://jetcalcship.web.app"}})
 
+def read_excel(file) -> pd.DataFrame:
+    """
+    Read the active sheet of an Excel file into a DataFrame, streaming only the cell values.
+    Headers are named like pd.read_excel does: 'Unnamed: i' when blank and 'name.1' when repeated.
+
+    Args:
+        file: The Excel file, as a path or a file-like object.
+
+    Returns:
+        pd.DataFrame: The sheet data, with the first row as header.
+    """
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.active
+        worksheet.reset_dimensions()
+
+        rows = worksheet.values
+        header = list(next(rows, ()))
+
+        # Formatted but empty cells are read as None, skip empty rows so they do not change the dtypes
+        rows = [row for row in rows if any(cell is not None for cell in row)]
+    finally:
+        workbook.close()
+
+    # Keep every column that has a header or data in any row
+    width = 0
+    for row in [header] + rows:
+        filled = [key for key, cell in enumerate(row) if cell is not None]
+        if filled:
+            width = max(width, filled[-1] + 1)
+
+    header = header[:width] + [None] * (width - len(header))
+    rows = [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows]
+
+    # Rename blank and duplicated headers, unnamed columns are deduplicated last
+    unnamed = [key for key, name in enumerate(header) if name is None]
+    header = [f'Unnamed: {key}' if name is None else name for key, name in enumerate(header)]
+
+    counts = {}
+    for key in [key for key in range(width) if key not in unnamed] + unnamed:
+        name = original_name = header[key]
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[original_name] = count + 1
+            name = f'{original_name}.{count}'
+            count = count + 1 if name in header else counts.get(name, 0)
+
+        header[key] = name
+        counts[name] = count + 1
+
+    return pd.DataFrame(rows, columns=header)
+
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     try:
@@ -24,7 +78,7 @@ def upload_file():
         # Ensure the file is an Excel file
         if file and file.filename.endswith('.xlsx'):
             # Read the Excel file into a DataFrame
-            excel_data = pd.read_excel(file)
+            excel_data = read_excel(file)
 
             # Validator to check the excel data 
             validator = Validator(dataframe=excel_data)
@@ -35,7 +89,7 @@ def upload_file():
 
             # Save the updated DataFrame to a new Excel file
             output = io.BytesIO()
-            writer = pd.ExcelWriter(output, engine='openpyxl')
+            writer = pd.ExcelWriter(output, engine='xlsxwriter')
 
             excel_data.to_excel(writer, index=False)
             writer.close()
@@ -0,0 +1,85 @@
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def find_conflicts(a: np.ndarray, b: np.ndarray, groups: np.ndarray):
+    """
+    Find, for every interval [a[i], b[i]], the intervals j of the same group where b[i] > a[j] and b[j] > b[i].
+
+    Args:
+        a (np.ndarray): Lower bounds of the intervals.
+        b (np.ndarray): Upper bounds of the intervals.
+        groups (np.ndarray): Integer key of each interval, only intervals with the same key are compared.
+
+    Returns:
+        tuple: (starts, ends, neighbor_idx), the conflicts of row i are
+        neighbor_idx[starts[i]:ends[i]], as positions in ascending order.
+    """
+    n = a.shape[0]
+    starts = np.zeros(n, dtype=np.int64)
+    ends = np.zeros(n, dtype=np.int64)
+    neighbor_idx = np.empty(n, dtype=np.int64)
+    position = 0
+
+    # Each group is a slice of the rows sorted by key
+    rows = np.argsort(groups, kind='mergesort')
+    sorted_groups = groups[rows]
+
+    segment_start = 0
+    for segment_end in range(1, n + 1):
+        if segment_end < n and sorted_groups[segment_end] == sorted_groups[segment_start]:
+            continue
+
+        segment = rows[segment_start:segment_end]
+        size = segment.shape[0]
+
+        # Sweep over the bounds: row i conflicts with the intervals j that are open at b[i],
+        # at equal coordinates intervals are closed (kind 0) before the queries (kind 1)
+        # and opened (kind 2) after them, which keeps both comparisons strict
+        coordinates = np.concatenate((b[segment], b[segment], a[segment]))
+        kinds = np.concatenate((np.zeros(size, np.int64), np.ones(size, np.int64), np.full(size, 2, np.int64)))
+        events = np.argsort(coordinates, kind='mergesort')
+
+        active = np.empty(size, dtype=np.int64)
+        slots = np.full(size, -1, dtype=np.int64)
+        count = 0
+
+        for event in events:
+            kind = kinds[event]
+            i = event - kind * size
+
+            # Inverted or NaN intervals are never open and NaN bounds never conflict
+            if kind != 1 and not a[segment[i]] < b[segment[i]]:
+                continue
+
+            if kind == 2:
+                active[count] = i
+                slots[i] = count
+                count += 1
+
+            elif kind == 0:
+                count -= 1
+                last = active[count]
+                active[slots[i]] = last
+                slots[last] = slots[i]
+                slots[i] = -1
+
+            elif b[segment[i]] == b[segment[i]]:
+                row = segment[i]
+                if position + count > neighbor_idx.shape[0]:
+                    grown = np.empty(2 * (position + count), dtype=np.int64)
+                    grown[:position] = neighbor_idx[:position]
+                    neighbor_idx = grown
+
+                starts[row] = position
+                for k in range(count):
+                    neighbor_idx[position] = segment[active[k]]
+                    position += 1
+
+                ends[row] = position
+                neighbor_idx[starts[row]:position] = np.sort(neighbor_idx[starts[row]:position])
+
+        segment_start = segment_end
+
+    return starts, ends, neighbor_idx[:position]
@@ -3,6 +3,7 @@ import numpy as np
 
 # Import custom functions from 'models.highlight_errors' (assumed to be defined elsewhere)
 from models.highlight_errors import highlight_headers, error_color_css
+from models._conflict_numba import find_conflicts
 
 class Validator():
     def __init__(self, dataframe: pd.DataFrame) -> None:
@@ -25,7 +26,9 @@ class Validator():
             'Prazo',
             'DiaUtil'
         ]
+        self.numeric_columns = ['CepInicio', 'CepFim', 'PesoInicio', 'PesoFim', 'Valor', 'Prazo']
         self.real_columns_name = list(self.dataframe.columns.values)
+        self.css_mask = None
 
 
     def style_dataframe(self) -> None:
@@ -38,9 +41,6 @@ class Validator():
         # Change data types by replacing ',' with '.'
         self._check_values()
 
-        # Check column names
-        self._check_columns_name()
-
 
     def _check_columns_quantity(self) -> None:
         """
@@ -55,72 +55,70 @@ class Validator():
         """
         Check and update data types, handle conflicts in CEP and Peso columns.
         """
-        columns = ['CepInicio', 'CepFim', 'PesoInicio', 'PesoFim', 'Valor', 'Prazo']
+        columns = self.numeric_columns
         dtype = True
 
         if all(column in self.dataframe.columns for column in columns):
-            for column in columns[2:4]:
-                try:
-                    self.dataframe[column] = self.dataframe[column].str.replace(',', '.').astype(float)
-                except:
-                    dtype = False
+            # Parse every numeric column and flag its wrong cells in a single pass
+            wrong_dtype = {}
+            for column in columns:
+                clean, wrong_dtype[column] = self._validate_column(self.dataframe[column])
+
+                # Only Peso columns are converted, by replacing ',' with '.'
+                if column in columns[2:4]:
+                    if wrong_dtype[column].any():
+                        dtype = False
+                    else:
+                        self.dataframe[column] = clean
 
             if dtype:
                 # Check all data types
                 self._check_data_types()
 
                 # Find conflicted ranges in CEP
-                self.dataframe = self._find_conflited_ranges(columns[:4], peso=False, dataframe=self.dataframe.copy())
+                self.dataframe = self._find_conflited_ranges(columns[:4], peso=False, dataframe=self.dataframe)
 
-                # Find conflicted ranges in Peso by cutting the dataframe in CEP intervals
-                cep_interval = self.__get_unique_values(columns[:2], dataframe=self.dataframe.copy())
+                # Find conflicted ranges in Peso inside each CEP interval
+                self.dataframe = self._find_conflited_ranges(columns[:4], peso=True, dataframe=self.dataframe)
 
-                # Cut the dataframe by CEP intervals
-                complete_dataframe = pd.DataFrame()
-                for low_interval, high_interval in cep_interval:
-                    cutted_dataframe = self.dataframe.loc[(self.dataframe[columns[0]] == low_interval) & (self.dataframe[columns[1]] == high_interval)].copy()
+                self.dataframe['PesoFim'] = self.dataframe['PesoFim'].map("{:.3f}".format)
+                self.dataframe['PesoInicio'] = self.dataframe['PesoInicio'].map("{:.3f}".format)
 
-                    # Search for conflicted ranges in Peso
-                    cutted_dataframe = self._find_conflited_ranges(columns[:4], peso=True, dataframe=cutted_dataframe)
-                    complete_dataframe = pd.concat([complete_dataframe, cutted_dataframe], axis=0)
-                
-                self.dataframe = complete_dataframe.sort_index().copy()
+            # Color dataframe, the Styler is only built when the data is exported
+            self.css_mask = pd.DataFrame('', index=self.dataframe.index, columns=self.dataframe.columns)
+            for column in columns:
+                # Masks are aligned by index
+                self.css_mask[column] = wrong_dtype[column].map({True: error_color_css, False: ''})
 
-            # Color dataframe
-            self._check_numbers_errors(columns)
+            # Highlight the whole row when it has conflicts
+            if 'Erros na Linha' in self.dataframe.columns:
+                self.css_mask.loc[(self.dataframe['Erros na Linha'] != '').to_numpy()] = error_color_css
         
         else:
             self.all_columns = False
 
 
-    def _check_numbers_errors(self, columns: list):
+    def _validate_column(self, series: pd.Series) -> tuple:
         """
-        Apply formatting and highlighting to numeric columns.
+        Parse a numeric column, accepting ',' as decimal separator.
+
+        Args:
+            series (pd.Series): The column to be parsed.
+
+        Returns:
+            tuple: The column as float64 and a boolean Series flagging the cells that are not numbers.
         """
-        def format_wrong_dtype(row: pd.Series):
-            colors = []
-            for value in row:
-                if row.name in columns:
-                    try:
-                        float(value.replace(',', '.')) if isinstance(value, str) else float(value)
-                        colors.append('')
-                    except:
-                        colors.append(error_color_css)
-                else:
-                    colors.append('')
-            return colors
-
-        def format_range(row) -> str:
-            colors = [''] * len(row)
-            if row['Erros na Linha'] != '':
-                colors = [error_color_css] * len(row)
-            return colors
-        
-        self.dataframe['PesoFim'] = self.dataframe['PesoFim'].map("{:.3f}".format)
-        self.dataframe['PesoInicio'] = self.dataframe['PesoInicio'].map("{:.3f}".format)
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            return series.astype(np.float64), pd.Series(False, index=series.index)
+
+        # ',' and '.' have the same width, so they are swapped in place on the code points
+        values = series.to_numpy().astype(str)
+        code_points = values.view(np.uint32)
+        code_points[code_points == ord(',')] = ord('.')
+
+        numeric = pd.Series(pd.to_numeric(values, errors='coerce'), index=series.index, dtype=np.float64)
 
-        self.dataframe = self.dataframe.style.apply(format_wrong_dtype).format(precision=3, subset=columns)
-        self.dataframe = self.dataframe.apply(format_range, axis=1)
+        return numeric, numeric.isna() & series.notna()
 
 
     def _check_data_types(self) -> None:
@@ -148,10 +146,7 @@ class Validator():
     # Old and unused module
     def _check_ranges(self, columns:list, peso:bool) -> pd.DataFrame:
         def get_unique_values(columns:list, dataframe:pd.DataFrame) -> list:
-            values = [n for n in dataframe[columns].values.tolist()]
-            values = list(set(tuple(element) for element in values))
-
-            return values
+            return list(map(tuple, dataframe[columns].drop_duplicates().to_numpy().tolist()))
 
         dataframe = self.dataframe.copy()
         auxiliary_dataframe = pd.DataFrame()
@@ -234,9 +229,16 @@ class Validator():
             pd.DataFrame: The updated DataFrame with conflict information.
         """
         if peso:
+            # Peso ranges only conflict inside the same CEP interval, encoded as a single integer key
+            codes_low, _ = pd.factorize(dataframe[columns[0]])
+            codes_high, uniques_high = pd.factorize(dataframe[columns[1]])
+            groups = codes_low.astype(np.int64) * len(uniques_high) + codes_high
+
             columns = columns[2:]
             message = ' + PESO: '
         else:
+            groups = np.zeros(len(dataframe), dtype=np.int64)
+
             columns = columns[:2]
             message = 'CEP: '
 
@@ -246,63 +248,72 @@ class Validator():
         if 'Erros na Linha' not in dataframe.columns:
             dataframe['Erros na Linha'] = ''
 
-        for key, value in enumerate(dataframe[[col1, col2]].values):
-            column1, column2 = value
-            conflicts = dataframe.loc[(column2 > dataframe[col1]) & (dataframe[col2] > column2)].index
+        a = dataframe[col1].to_numpy()
+        b = dataframe[col2].to_numpy()
+
+        # Sorted by group and start, valid ranges that end before the next one of their group starts can not conflict
+        order = np.lexsort((a, groups))
+        next_in_group = groups[order][1:] == groups[order][:-1]
+        if np.all(a <= b) and np.all((b[order][:-1] <= a[order][1:]) | ~next_in_group):
+            return dataframe
 
-            if len(conflicts) > 0:
-                dataframe.iloc[key, 9] = dataframe.iloc[key, 9] + message + ', '.join(map(str, conflicts))
+        starts, ends, neighbor_idx = find_conflicts(a, b, groups)
+        neighbours = dataframe.index.to_numpy()[neighbor_idx].tolist()
+
+        # Build the new message of each conflicted row once, then append them all together
+        keys = np.flatnonzero(ends > starts)
+        fragments = np.empty(len(keys), dtype=object)
+        fragments[:] = [
+            message + ', '.join(map(str, neighbours[start:end]))
+            for start, end in zip(starts[keys].tolist(), ends[keys].tolist())
+        ]
+
+        errors = np.array(dataframe['Erros na Linha'].to_numpy(), dtype=object)
+        errors[keys] = errors[keys] + fragments
+
+        dataframe['Erros na Linha'] = errors
 
         return dataframe
 
 
-    def _check_columns_name(self) -> pd.DataFrame.style:
+    def _check_columns_name(self, styled_df: pd.DataFrame.style) -> pd.DataFrame.style:
         """
         Check and style column names in the DataFrame.
 
+        Args:
+            styled_df (pd.DataFrame.style): The styled DataFrame.
+
         Returns:
             pd.DataFrame.style: The styled DataFrame.
         """
-        if not self.all_columns:
-            self.dataframe = self.dataframe.style
-
         if self.real_columns_name != self.columns_name:
-            styled_df = self.dataframe.map_index(
+            styled_df = styled_df.map_index(
                 lambda x: highlight_headers() if x not in self.columns_name else '',
                 axis=1
             )
-        
-        else:
-            styled_df = self.dataframe
 
-        self.dataframe = styled_df
+        return styled_df
 
 
-    def __get_unique_values(self, columns: list, dataframe: pd.DataFrame) -> list:
+    def get_dataframe(self, styled: bool = True) -> pd.DataFrame.style:
         """
-        Get unique values from specified columns in the DataFrame.
+        Get the DataFrame, styled by default.
 
         Args:
-            columns (list): List of column names to extract unique values from.
-            dataframe (pd.DataFrame): The DataFrame to extract values from.
+            styled (bool): Whether to return the styled DataFrame or the raw one.
 
         Returns:
-            list: List of unique values from the specified columns.
+            pd.DataFrame.style: The styled DataFrame, or the raw DataFrame if styled is False.
         """
-        values = [n for n in dataframe[columns].values.tolist()]
-        values = list(set(tuple(element) for element in values))
-
-        return values
+        if not styled:
+            return self.dataframe
 
+        styled_df = self.dataframe.style
+        if self.css_mask is not None:
+            styled_df = styled_df.apply(lambda _: self.css_mask, axis=None).format(precision=3, subset=self.numeric_columns)
 
-    def get_dataframe(self) -> pd.DataFrame.style:
-        """
-        Get the styled DataFrame.
-
-        Returns:
-            pd.DataFrame.style: The styled DataFrame.
-        """
-        return self.dataframe
+        # Check column names
+        return self._check_columns_name(styled_df)
 
 
     def save_to_excel(self, filename: str = 'output/output.xlsx') -> None:
@@ -312,4 +323,4 @@ class Validator():
         Args:
             filename (str): The name of the output Excel file.
         """
-        self.dataframe.to_excel(filename)
+        self.get_dataframe().to_excel(filename)